@@ -38,24 +38,147 @@ st.title("🚗 InsureA Sigortacılık Analiz Sistemi")
 st.sidebar.header("📂 Veri Yükle")
 hasar_file = st.sidebar.file_uploader("Hasar/Prim Verisi", type=['xlsx', 'xls', 'xlsb'])
 
+TARIH_KOLONLARI = ['POLICE_BASLANGIC_TARIHI', 'POLICE_BITIS_TARIHI', 'ZEYIL_ONAY_TARIHI',
+                   'IPTAL_TARIHI', 'TAZMINAT_ODEME_TARIH', 'TAZMINAT_MAX_ODEME_TARIH', 'HASAR_TARIHI']
+
 @st.cache_data(ttl=7200, show_spinner="Veri yükleniyor...")
 def load_excel(file):
     if file:
         try:
             df = pd.read_excel(file)
-            # Tarih sütunlarını düzelt
-            date_cols = ['POLICE_BASLANGIC_TARIHI', 'POLICE_BITIS_TARIHI', 'ZEYIL_ONAY_TARIHI', 
-                        'IPTAL_TARIHI', 'TAZMINAT_ODEME_TARIH', 'TAZMINAT_MAX_ODEME_TARIH', 'HASAR_TARIHI']
-            for col in date_cols:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-            return df
         except Exception as e:
             st.error(f"Dosya okuma hatası: {e}")
-            return None
-    return None
+            return None, None, None
+        try:
+            return veri_dogrula(df)
+        except Exception as e:
+            # Doğrulama başarısızsa veri kontrolsüz olarak yüklenir
+            st.warning(f"Veri doğrulama hatası, veri kontrol edilmeden yüklendi: {e}")
+            for col in TARIH_KOLONLARI:
+                if col in df.columns:
+                    df[col] = pd.to_datetime(df[col], errors='coerce')
+            return df, None, None
+    return None, None, None
+
+def veri_dogrula(df):
+    """Tarihleri dönüştür, satır bazlı kalite kontrollerini tek geçişte yap"""
+
+    zorunlu_kolonlar = ['POLICE_NO', 'TOPLAM_KAZANILMIS_PRIM', 'KAZANILMIS_ADET', 'TOPLAM_IHBAR_ADET',
+                        'TAZMINAT_TOPLAM_ODEME_TUTAR', 'MASRAF_TOPLAM_ODEME_TUTAR',
+                        'RUCU_TOPLAM_ODEME_TUTAR', 'SOVTAJ_TOPLAM_ODEME_TUTAR',
+                        'TAZMINAT_TOPLAM_MUALLAK_TUTAR', 'MASRAF_TOPLAM_MUALLAK_TUTAR',
+                        'RUCU_TOPLAM_MUALLAK_TUTAR', 'SOVTAJ_TOPLAM_MUALLAK_TUTAR',
+                        'SURUCU_YASI', 'MODEL_YILI']
+    # Poliçe süresini belirleyen tarihler okunamazsa satır karantinaya alınır
+    police_tarihleri = ['POLICE_BASLANGIC_TARIHI', 'POLICE_BITIS_TARIHI', 'IPTAL_TARIHI']
+    tutar_cols = [c for c in df.columns if str(c).endswith('_TUTAR') or str(c).endswith('_ADET')]
+
+    # Kontrol adı -> (hatalı satır maskesi, aksiyon)
+    kontroller = {}
+    # Dönüştürülen sütunların ham değerleri (karantina dosyası için)
+    ham = {}
+
+    # Tarih sütunlarını düzelt, okunamayan değerleri işaretle
+    for col in TARIH_KOLONLARI:
+        if col in df.columns:
+            tarih = pd.to_datetime(df[col], errors='coerce')
+            aksiyon = 'Karantina' if col in police_tarihleri else 'Uyarı'
+            kontroller[f'Geçersiz tarih: {col}'] = (df[col].notna() & tarih.isna(), aksiyon)
+            ham[col] = df[col]
+            df[col] = tarih
+
+    # Sayısal sütunlarda metin değerler
+    for col in tutar_cols + ['TOPLAM_KAZANILMIS_PRIM', 'SURUCU_YASI', 'MODEL_YILI']:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            sayi = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            kontroller[f'Sayısal olmayan değer: {col}'] = (df[col].notna() & np.isnan(sayi), 'Karantina')
+            ham[col] = df[col]
+            df[col] = sayi
+
+    # Tarih sırası
+    if 'POLICE_BASLANGIC_TARIHI' in df.columns and 'POLICE_BITIS_TARIHI' in df.columns:
+        kontroller['Başlangıç tarihi bitişten sonra'] = (
+            df['POLICE_BASLANGIC_TARIHI'] > df['POLICE_BITIS_TARIHI'], 'Karantina')
+    if 'POLICE_BASLANGIC_TARIHI' in df.columns and 'IPTAL_TARIHI' in df.columns:
+        kontroller['İptal tarihi başlangıçtan önce'] = (
+            df['IPTAL_TARIHI'] < df['POLICE_BASLANGIC_TARIHI'], 'Karantina')
+
+    # Birebir aynı satırlar (ilk kayıt tutulur)
+    tekrarli_satir = df.duplicated(keep='first')
+    kontroller['Tekrarlı satır'] = (tekrarli_satir, 'Karantina')
+
+    # Yenileme ve zeyiller aynı poliçe numarasını taşıyabilir
+    if 'POLICE_NO' in df.columns:
+        kontroller['Tekrarlı POLICE_NO (yenileme/zeyil)'] = (
+            df['POLICE_NO'].notna() & df.duplicated('POLICE_NO', keep='first') & ~tekrarli_satir, 'Uyarı')
+
+    # Negatif tutar ve adetler; iptal iadeleri ve muallak çözülmeleri negatif olabilir
+    for col in tutar_cols:
+        aksiyon = 'Karantina' if str(col).endswith('_ODEME_TUTAR') else 'Uyarı'
+        kontroller[f'Negatif değer: {col}'] = (df[col] < 0, aksiyon)
+    if 'TOPLAM_KAZANILMIS_PRIM' in df.columns:
+        kontroller['Negatif değer: TOPLAM_KAZANILMIS_PRIM'] = (df['TOPLAM_KAZANILMIS_PRIM'] < 0, 'Uyarı')
+
+    # Aralık dışı nitelikler tutarları bozmaz; boşaltılır ve varsayılan değer atanır
+    current_year = pd.Timestamp.now().year
+    if 'SURUCU_YASI' in df.columns:
+        aralik_disi = df['SURUCU_YASI'].notna() & ~df['SURUCU_YASI'].between(18, 100)
+        kontroller['Sürücü yaşı 18-100 dışında (35 atanır)'] = (aralik_disi, 'Uyarı')
+        kontroller['Sürücü yaşı boş (35 atanır)'] = (df['SURUCU_YASI'].isna(), 'Uyarı')
+        ham.setdefault('SURUCU_YASI', df['SURUCU_YASI'])
+        df['SURUCU_YASI'] = df['SURUCU_YASI'].where(~aralik_disi)
+    if 'MODEL_YILI' in df.columns:
+        aralik_disi = df['MODEL_YILI'].notna() & ~df['MODEL_YILI'].between(1950, current_year + 1)
+        kontroller[f'Model yılı 1950-{current_year + 1} dışında ({current_year - 5} atanır)'] = (aralik_disi, 'Uyarı')
+        kontroller[f'Model yılı boş ({current_year - 5} atanır)'] = (df['MODEL_YILI'].isna(), 'Uyarı')
+        ham.setdefault('MODEL_YILI', df['MODEL_YILI'])
+        df['MODEL_YILI'] = df['MODEL_YILI'].where(~aralik_disi)
+
+    # Rapor
+    toplam = len(df)
+    rapor = [{'Kontrol': f'Eksik sütun: {col}', 'Satır Sayısı': toplam, 'Aksiyon': 'Eksik Sütun'}
+             for col in zorunlu_kolonlar if col not in df.columns]
+    karantina_maske = np.zeros(toplam, dtype=bool)
+    for ad, (maske, aksiyon) in kontroller.items():
+        maske = maske.to_numpy(dtype=bool, na_value=False)
+        adet = int(maske.sum())
+        if adet > 0:
+            rapor.append({'Kontrol': ad, 'Satır Sayısı': adet, 'Aksiyon': aksiyon})
+        if aksiyon == 'Karantina':
+            karantina_maske |= maske
+
+    rapor = pd.DataFrame(rapor, columns=['Kontrol', 'Satır Sayısı', 'Aksiyon'])
+    rapor['Oran (%)'] = (rapor['Satır Sayısı'] / toplam * 100).round(2) if toplam > 0 else 0
+
+    # Karantina dosyası ham değerleri ve hata nedenlerini taşır
+    karantina = df[karantina_maske].copy()
+    for col, seri in ham.items():
+        karantina[col] = seri.to_numpy()[karantina_maske]
+    neden = pd.Series('', index=karantina.index)
+    for ad, (maske, aksiyon) in kontroller.items():
+        if aksiyon == 'Karantina':
+            neden = neden + np.where(maske.to_numpy(dtype=bool, na_value=False)[karantina_maske], ad + '; ', '')
+    karantina['HATA_NEDENI'] = neden.str.rstrip('; ')
+
+    return df[~karantina_maske].reset_index(drop=True), rapor, karantina
 
-df_raw = load_excel(hasar_file)
+df_raw, kalite_raporu, karantina = load_excel(hasar_file)
+
+# Veri kalite raporu
+if kalite_raporu is not None:
+    with st.sidebar.expander("🧪 Veri Kalitesi", expanded=len(karantina) > 0):
+        st.metric("Analize Alınan Satır", f"{len(df_raw):,}")
+        st.metric("Karantinaya Alınan Satır", f"{len(karantina):,}")
+        if (kalite_raporu['Aksiyon'] == 'Eksik Sütun').any():
+            st.error("Zorunlu sütunlar eksik, bazı analizler çalışmayabilir")
+        if len(kalite_raporu) > 0:
+            st.dataframe(kalite_raporu, use_container_width=True, hide_index=True)
+        else:
+            st.success("Tüm kontroller başarılı")
+        if len(karantina) > 0:
+            st.download_button("📥 Karantina Dosyasını İndir",
+                               karantina.to_csv(index=False).encode('utf-8-sig'),
+                               file_name="karantina.csv", mime="text/csv")
 
 # Ana hesaplama fonksiyonu
 @st.cache_data(ttl=7200)
@@ -160,6 +283,234 @@ def segment_analizi(df, grup_kolonu):
     
     return analiz.sort_values('H/P Oranı (%)', ascending=False)
 
+# Verinin çekildiği tarih: işlem tarihlerinin en büyüğü (bitiş tarihleri gelecekte olabilir)
+def degerleme_tarihi_bul(df):
+    """Veri setindeki son işlem tarihini değerleme tarihi olarak bul"""
+    islem_kolonlari = ['POLICE_BASLANGIC_TARIHI', 'ZEYIL_ONAY_TARIHI', 'IPTAL_TARIHI',
+                       'HASAR_TARIHI', 'TAZMINAT_ODEME_TARIH', 'TAZMINAT_MAX_ODEME_TARIH']
+    tarihler = [df[col].max() for col in islem_kolonlari if col in df.columns]
+    tarihler = [t for t in tarihler if pd.notna(t)]
+    return max(tarihler).normalize() if tarihler else pd.Timestamp.now().normalize()
+
+# Takvim ayı bazlı kazanılmış prim ve maruziyet
+@st.cache_data(ttl=7200)
+def kazanilmis_donem_hesapla(df, degerleme_tarihi):
+    """Kazanılmış prim ve adedi poliçenin geçen süresine göre takvim aylarına dağıt (vektörel)"""
+
+    bas = df['POLICE_BASLANGIC_TARIHI']
+    bit = df['POLICE_BITIS_TARIHI']
+
+    # İptal edilen poliçelerde maruziyet iptal tarihinde biter
+    son = bit
+    if 'IPTAL_TARIHI' in df.columns:
+        iptal = df['IPTAL_TARIHI']
+        son = bit.where(iptal.isna() | (iptal >= bit), iptal)
+
+    # Başlangıç tarihi olmayan satırlar (prim ve hasar) dağıtılamaz
+    bas_var = bas.notna().to_numpy()
+    son_var = son.notna().to_numpy()
+    bas_gun = bas.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    son_gun = son.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    prim = df['TOPLAM_KAZANILMIS_PRIM'].fillna(0).to_numpy(dtype=float)
+    adet = df['KAZANILMIS_ADET'].fillna(0).to_numpy(dtype=float)
+
+    # Kazanılmış prim ve adet, başlangıçtan değerleme günü (dahil) veya bitişe kadar geçen süreye yayılır
+    degerleme_gun = np.datetime64(pd.Timestamp(degerleme_tarihi).date(), 'D').astype(np.int64)
+    kazanc_son = np.minimum(son_gun, degerleme_gun + 1)
+    yayilan = bas_var & son_var & (kazanc_son > bas_gun)
+
+    # Süresi hesaplanamayan poliçelerin primi ve adedi başlangıç ayına yazılır
+    tek_ay = bas_var & ~yayilan
+
+    parcalar = []
+    if yayilan.any():
+        bas_gun, kazanc_son = bas_gun[yayilan], kazanc_son[yayilan]
+        sure = kazanc_son - bas_gun
+
+        # Fark dizisi: başlangıç gününde günlük tutar eklenir, bitiş gününde çıkarılır
+        gun0 = bas_gun.min()
+        gun_sayisi = int(kazanc_son.max() - gun0)
+        bas_idx = bas_gun - gun0
+        son_idx = kazanc_son - gun0
+
+        def gunluk_dagit(agirlik):
+            fark = (np.bincount(bas_idx, weights=agirlik, minlength=gun_sayisi + 1) -
+                    np.bincount(son_idx, weights=agirlik, minlength=gun_sayisi + 1))
+            return np.cumsum(fark)[:gun_sayisi]
+
+        gunluk_prim = gunluk_dagit(prim[yayilan] / sure)
+        gunluk_maruziyet = gunluk_dagit(adet[yayilan] / sure)
+
+        # Günleri takvim aylarına topla
+        aylar = (gun0 + np.arange(gun_sayisi)).astype('datetime64[D]').astype('datetime64[M]')
+        ay_listesi, ay_bas = np.unique(aylar, return_index=True)
+        parcalar.append(pd.DataFrame({
+            'AY': pd.DatetimeIndex(ay_listesi.astype('datetime64[ns]')).to_period('M'),
+            'TOPLAM_KAZANILMIS_PRIM': np.add.reduceat(gunluk_prim, ay_bas),
+            'KAZANILMIS_ADET': np.add.reduceat(gunluk_maruziyet, ay_bas)
+        }))
+
+    if tek_ay.any():
+        parcalar.append(pd.DataFrame({
+            'AY': bas[tek_ay].dt.to_period('M').values,
+            'TOPLAM_KAZANILMIS_PRIM': prim[tek_ay],
+            'KAZANILMIS_ADET': adet[tek_ay]
+        }))
+
+    # Hasar ve ihbarlar hasar tarihinin ayına yazılır
+    hasar_df = df[bas_var]
+    hasar_tarihi = hasar_df['HASAR_TARIHI'].fillna(hasar_df['POLICE_BASLANGIC_TARIHI']) \
+        if 'HASAR_TARIHI' in df.columns else hasar_df['POLICE_BASLANGIC_TARIHI']
+    parcalar.append(hasar_df.groupby(hasar_tarihi.dt.to_period('M')).agg({
+        'NET_HASAR': 'sum',
+        'TOPLAM_IHBAR_ADET': 'sum'
+    }).rename_axis('AY').reset_index())
+
+    aylik = pd.concat(parcalar, ignore_index=True).fillna(0).groupby('AY').agg({
+        'TOPLAM_KAZANILMIS_PRIM': 'sum',
+        'KAZANILMIS_ADET': 'sum',
+        'NET_HASAR': 'sum',
+        'TOPLAM_IHBAR_ADET': 'sum'
+    }).reset_index()
+
+    aylik['H/P Oranı'] = np.where(
+        aylik['TOPLAM_KAZANILMIS_PRIM'] > 0,
+        aylik['NET_HASAR'] / aylik['TOPLAM_KAZANILMIS_PRIM'] * 100,
+        0
+    )
+
+    # Kazanılmış adet başına ihbar
+    aylik['Hasar Frekansı (%)'] = np.where(
+        aylik['KAZANILMIS_ADET'] > 0,
+        aylik['TOPLAM_IHBAR_ADET'] / aylik['KAZANILMIS_ADET'] * 100,
+        0
+    )
+
+    disarida = int((~bas_var).sum())
+    baslangic_ayinda = int(tek_ay.sum())
+    return aylik, disarida, baslangic_ayinda
+
+# Prim değişikliği simülasyonu
+def prim_simulasyonu(prim, hasar, police, degisim, esneklik, kalan=(0, 0, 0)):
+    """Segment bazlı prim değişikliklerinin portföy etkisini hesapla (vektörel)"""
+
+    # Fiyat esnekliğine göre portföyde kalan poliçe oranı
+    # (prim artışı iptale, indirim yeni işe yol açar)
+    kalma_orani = np.clip(1 - esneklik * degisim / 100, 0, None)
+
+    # Ayrılan poliçelerin segment ortalaması risk taşıdığı varsayılır
+    yeni_prim = prim * (1 + degisim / 100) * kalma_orani
+    yeni_hasar = hasar * kalma_orani
+    yeni_police = police * kalma_orani
+
+    # Segmenti boş satırlar (prim, hasar, poliçe) değişmeden portföyde kalır
+    kalan_prim, kalan_hasar, kalan_police = kalan
+    toplam_prim = yeni_prim.sum() + kalan_prim
+    toplam_hasar = yeni_hasar.sum() + kalan_hasar
+
+    return {
+        'segment_prim': yeni_prim,
+        'segment_hasar': yeni_hasar,
+        'segment_police': yeni_police,
+        'prim': toplam_prim,
+        'hasar': toplam_hasar,
+        'police': yeni_police.sum() + kalan_police,
+        'hp': (toplam_hasar / toplam_prim * 100) if toplam_prim > 0 else 0,
+        'kar_zarar': toplam_prim - toplam_hasar
+    }
+
+# Simülatör arayüzü; fragment olarak yalnızca kendisi yeniden çalışır
+@st.fragment
+def prim_simulatoru(segmentler, kolon, onerilen, portfoy):
+    """Önerilen segmentlere prim değişikliği uygula ve portföy etkisini göster"""
+
+    st.subheader("🎚️ Prim Değişikliği Simülatörü")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        artis_orani = st.slider("Zararlı Segment Prim Artışı (%)", 0, 100, 20, step=5)
+    with col2:
+        indirim_orani = st.slider("Karlı Segment Prim İndirimi (%)", 0, 50, 10, step=5)
+    with col3:
+        esneklik = st.slider("Fiyat Esnekliği", 0.0, 2.0, 0.5, step=0.1,
+                             help="%1 prim artışında portföyden ayrılan poliçe oranı (%)")
+
+    if not onerilen.any():
+        st.info("Simülasyon için önerilen segment yok")
+        return
+
+    # Portföy toplamı için tüm segmentler, değişiklik yalnızca önerilenlere
+    hp = segmentler['H/P Oranı (%)'].to_numpy()
+    varsayilan_degisim = np.where(hp > 100, artis_orani, np.where(hp < 50, -indirim_orani, 0))
+
+    editor_df = segmentler.loc[onerilen, [kolon, 'H/P Oranı (%)', 'Kazanılmış Prim', 'Net Hasar']].copy()
+    editor_df['Prim Değişimi (%)'] = varsayilan_degisim[onerilen].astype(float)
+
+    duzenlenen = st.data_editor(
+        editor_df,
+        column_config={
+            'Prim Değişimi (%)': st.column_config.NumberColumn(min_value=-90, max_value=200, step=1)
+        },
+        disabled=[kolon, 'H/P Oranı (%)', 'Kazanılmış Prim', 'Net Hasar'],
+        use_container_width=True,
+        key=f"simulasyon_{kolon}_{artis_orani}_{indirim_orani}"
+    )
+
+    degisim = np.zeros(len(segmentler))
+    degisim[onerilen] = duzenlenen['Prim Değişimi (%)'].fillna(0).to_numpy(dtype=float)
+
+    prim = segmentler['Kazanılmış Prim'].to_numpy(dtype=float)
+    hasar = segmentler['Net Hasar'].to_numpy(dtype=float)
+    police = segmentler['Poliçe Sayısı'].to_numpy(dtype=float)
+
+    # groupby boş segmentleri düşürür; farkı sabit olarak portföye ekle
+    kalan = (portfoy[0] - prim.sum(), portfoy[1] - hasar.sum(), portfoy[2] - police.sum())
+    if kalan[2] > 0:
+        st.caption(f"'{kolon}' değeri boş {kalan[2]:,.0f} poliçe değiştirilmeden portföy toplamına dahil edildi")
+
+    mevcut = prim_simulasyonu(prim, hasar, police, np.zeros_like(prim), esneklik, kalan)
+    sonuc = prim_simulasyonu(prim, hasar, police, degisim, esneklik, kalan)
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Kazanılmış Prim", f"₺{sonuc['prim']:,.0f}",
+                  delta=f"₺{sonuc['prim'] - mevcut['prim']:,.0f}")
+    with col2:
+        st.metric("Net Hasar", f"₺{sonuc['hasar']:,.0f}",
+                  delta=f"₺{sonuc['hasar'] - mevcut['hasar']:,.0f}", delta_color="inverse")
+    with col3:
+        st.metric("H/P Oranı", f"%{sonuc['hp']:.1f}",
+                  delta=f"{sonuc['hp'] - mevcut['hp']:.1f} puan", delta_color="inverse")
+    with col4:
+        st.metric("Kar/Zarar", f"₺{sonuc['kar_zarar']:,.0f}",
+                  delta=f"₺{sonuc['kar_zarar'] - mevcut['kar_zarar']:,.0f}")
+    with col5:
+        st.metric("Poliçe Sayısı", f"{sonuc['police']:,.0f}",
+                  delta=f"{sonuc['police'] - mevcut['police']:,.0f}")
+
+    # Segment bazlı sonuç
+    yeni_prim = sonuc['segment_prim'][onerilen]
+    yeni_hasar = sonuc['segment_hasar'][onerilen]
+    segment_sonuc = pd.DataFrame({
+        kolon: segmentler.loc[onerilen, kolon].values,
+        'Prim Değişimi (%)': degisim[onerilen],
+        'Mevcut H/P (%)': hp[onerilen],
+        'Yeni H/P (%)': np.where(yeni_prim > 0, (yeni_hasar / yeni_prim * 100).round(1), 0),
+        'Yeni Prim': yeni_prim,
+        'Yeni Hasar': yeni_hasar,
+        'Yeni Kar/Zarar': yeni_prim - yeni_hasar,
+        'Yeni Poliçe Sayısı': sonuc['segment_police'][onerilen]
+    })
+    st.dataframe(segment_sonuc.style.format({
+        'Prim Değişimi (%)': '{:+.0f}%',
+        'Mevcut H/P (%)': '{:.1f}%',
+        'Yeni H/P (%)': '{:.1f}%',
+        'Yeni Prim': '₺{:,.0f}',
+        'Yeni Hasar': '₺{:,.0f}',
+        'Yeni Kar/Zarar': '₺{:,.0f}',
+        'Yeni Poliçe Sayısı': '{:,.0f}'
+    }), use_container_width=True, hide_index=True)
+
 # Sekmeler
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "📊 Özet Dashboard", 
@@ -318,8 +669,8 @@ with tab2:
         kolon = analiz_secenekleri[secilen_boyut]
         
         if kolon in df.columns:
-            analiz = segment_analizi(df, kolon)
-            analiz = analiz[analiz['Poliçe Sayısı'] >= min_police]
+            tum_segmentler = segment_analizi(df, kolon)
+            analiz = tum_segmentler[tum_segmentler['Poliçe Sayısı'] >= min_police]
             
             # Özet metrikler
             col1, col2, col3, col4 = st.columns(4)
@@ -402,6 +753,12 @@ with tab2:
                         st.write(f"• **{row[kolon]}**: H/P %{row['H/P Oranı (%)']:.0f} - Kar: ₺{row['Kar/Zarar']:,.0f}")
                 else:
                     st.write("Çok karlı segment yok")
+
+            # Prim simülatörü
+            onerilen = (tum_segmentler.index.isin(zararli_segmentler.index) |
+                        tum_segmentler.index.isin(karli_segmentler.index))
+            portfoy = (df['TOPLAM_KAZANILMIS_PRIM'].sum(), df['NET_HASAR'].sum(), df['POLICE_NO'].count())
+            prim_simulatoru(tum_segmentler, kolon, onerilen, portfoy)
         else:
             st.warning(f"'{kolon}' sütunu verilerinizde bulunamadı")
     else:
@@ -648,22 +1005,40 @@ with tab6:
         st.subheader("📈 Trend Analizi")
         
         if 'POLICE_BASLANGIC_TARIHI' in df.columns:
-            df['AY'] = df['POLICE_BASLANGIC_TARIHI'].dt.to_period('M')
-            
-            aylik = df.groupby('AY').agg({
-                'TOPLAM_KAZANILMIS_PRIM': 'sum',
-                'NET_HASAR': 'sum',
-                'TOPLAM_IHBAR_ADET': 'sum',
-                'KAZANILMIS_ADET': 'sum'
-            }).reset_index()
-            
+            donem_secenekleri = ["Poliçe Başlangıç Ayı"]
+            if 'POLICE_BITIS_TARIHI' in df.columns:
+                donem_secenekleri.insert(0, "Takvim Ayı (Kazanılmış)")
+            donem_bazi = st.radio("Dönem Bazı", donem_secenekleri, horizontal=True,
+                                  help="Takvim ayı: kazanılmış prim ve adet poliçe süresine göre aylara dağıtılır, "
+                                       "hasarlar hasar tarihinin ayına yazılır")
+
+            if donem_bazi.startswith("Takvim"):
+                degerleme_tarihi = st.date_input("Değerleme Tarihi", value=degerleme_tarihi_bul(df).date(),
+                                                 help="Bu gün dahil kazanılır. Varsayılan: verideki son işlem tarihi")
+                aylik, disarida, baslangic_ayinda = kazanilmis_donem_hesapla(df, pd.Timestamp(degerleme_tarihi))
+                if disarida > 0:
+                    st.warning(f"Başlangıç tarihi olmayan {disarida:,} satır (prim ve hasar) trende dahil edilmedi")
+                if baslangic_ayinda > 0:
+                    st.caption(f"Süresi hesaplanamayan {baslangic_ayinda:,} poliçenin primi başlangıç ayına yazıldı")
+                aylik = aylik.rename(columns={'KAZANILMIS_ADET': 'Kazanılmış Adet'})
+            else:
+                df['AY'] = df['POLICE_BASLANGIC_TARIHI'].dt.to_period('M')
+
+                aylik = df.groupby('AY').agg({
+                    'TOPLAM_KAZANILMIS_PRIM': 'sum',
+                    'NET_HASAR': 'sum',
+                    'TOPLAM_IHBAR_ADET': 'sum',
+                    'KAZANILMIS_ADET': 'sum'
+                }).reset_index()
+
+                aylik['H/P Oranı'] = np.where(
+                    aylik['TOPLAM_KAZANILMIS_PRIM'] > 0,
+                    aylik['NET_HASAR'] / aylik['TOPLAM_KAZANILMIS_PRIM'] * 100,
+                    0
+                )
+
             aylik['AY'] = aylik['AY'].astype(str)
-            aylik['H/P Oranı'] = np.where(
-                aylik['TOPLAM_KAZANILMIS_PRIM'] > 0,
-                aylik['NET_HASAR'] / aylik['TOPLAM_KAZANILMIS_PRIM'] * 100,
-                0
-            )
-            
+
             # Trend grafiği
             fig = go.Figure()
             